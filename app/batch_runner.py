@@ -0,0 +1,395 @@
+"""
+Offline batch scoring of résumé corpora against job descriptions.
+
+Runs the same PDF parsing, skill extraction and similarity scoring as the API,
+without the HTTP layer. Résumés are streamed in chunks through a process pool
+with a bounded number of chunks in flight, results are written as JSONL or
+Parquet as each chunk completes, and completed résumé IDs are checkpointed so
+an interrupted run can be resumed.
+
+Usage:
+    python -m app.batch_runner --resumes resumes/ --jobs jobs.jsonl \\
+        --output scores.jsonl --workers 2
+
+Inputs are either a directory of .pdf/.txt files (the filename is the ID) or
+a JSONL file whose lines have an "id" and either "text" or "path".
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Iterator
+
+from dotenv import load_dotenv
+
+from app.logging_config import forward_worker_logs, setup_logging
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_SUFFIXES = {".pdf", ".txt"}
+
+# Every worker loads its own copy of the models (about 2 GB resident with the
+# full-powered NER model), so memory rather than cores limits the worker count.
+# Each worker still uses several cores through torch's intra-op threads.
+DEFAULT_WORKERS = 2
+
+
+class BatchInputError(ValueError):
+    """Raised for invalid arguments or input files, reported as a usage error."""
+
+
+# --- Input reading ---
+def iter_documents(path: Path) -> Iterator[dict]:
+    """
+    Lazily yields {"id", "text"} or {"id", "path"} records from a directory or
+    JSONL file, so the corpus never has to fit in memory.
+    """
+    if path.is_dir():
+        for file_path in sorted(path.iterdir()):
+            if file_path.suffix.lower() in DOCUMENT_SUFFIXES:
+                yield {"id": file_path.name, "path": str(file_path)}
+        return
+
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise BatchInputError(f"{path}:{line_number}: invalid JSON: {e}")
+            if "id" not in record or not ("text" in record or "path" in record):
+                raise BatchInputError(
+                    f"{path}:{line_number}: expected 'id' and 'text' or 'path'"
+                )
+            yield record
+
+
+def load_text(record: dict) -> str:
+    """Returns a document's text, parsing PDFs with the API's extract_text."""
+    if "text" in record:
+        return record["text"]
+
+    path = Path(record["path"])
+    if path.suffix.lower() != ".pdf":
+        return path.read_text(encoding="utf-8")
+
+    from app.services.pdf_parser import extract_text
+
+    with open(path, "rb") as f:
+        return extract_text(SimpleNamespace(filename=path.name, file=f))
+
+
+def _chunks(records: Iterator[dict], size: int) -> Iterator[list[dict]]:
+    while chunk := list(islice(records, size)):
+        yield chunk
+
+
+# --- Worker process ---
+# Each worker loads its own copy of the models and scores whole chunks.
+_worker_jobs: list[dict] = []
+
+
+def _init_worker(jobs: list[dict], torch_threads: int, log_queue):
+    """Loads models once per worker and extracts job description skills."""
+    from app.logging_config import setup_worker_logging
+
+    # Before the model imports, so their load logs reach the parent too
+    setup_worker_logging(log_queue)
+
+    import torch
+    from app.services.ner_service import extract_skills_batch
+
+    # Split cores between workers instead of letting each one grab them all
+    torch.set_num_threads(torch_threads)
+
+    global _worker_jobs
+    texts = [load_text(job) for job in jobs]
+    skills = extract_skills_batch(texts)
+    _worker_jobs = [
+        {"id": str(job["id"]), "text": text, "skills": {e["word"].lower() for e in s}}
+        for job, text, s in zip(jobs, texts, skills)
+    ]
+
+
+def _score_texts(ids: list[str], texts: list[str]) -> list[dict]:
+    """Scores loaded résumé texts against every job with batched model calls."""
+    from app.services.ner_service import extract_skills_batch
+    from app.services.similarity_service import compute_similarity_matrix
+
+    skills = extract_skills_batch(texts)
+    matrix = compute_similarity_matrix(texts, [job["text"] for job in _worker_jobs])
+
+    rows = []
+    for i, resume_id in enumerate(ids):
+        resume_skills = sorted({e["word"] for e in skills[i]})
+        for j, job in enumerate(_worker_jobs):
+            matched = [s for s in resume_skills if s.lower() in job["skills"]]
+            rows.append(
+                _row(
+                    resume_id,
+                    job["id"],
+                    float(matrix[i, j]),
+                    resume_skills,
+                    matched,
+                    None,
+                )
+            )
+    return rows
+
+
+def _score_chunk(records: list[dict]) -> tuple[list[str], list[dict]]:
+    """
+    Scores one chunk of résumés against every job description.
+    Returns the IDs of résumés that scored successfully and the result rows:
+    one per résumé/job pair, or a single error row for a résumé that failed
+    to load or score. Failed résumés are not returned as scored, so they are
+    left out of the checkpoint and retried on the next run.
+    """
+    ids, texts, rows = [], [], []
+    for record in records:
+        try:
+            texts.append(load_text(record))
+            ids.append(str(record["id"]))
+        except Exception as e:
+            logger.error("Failed to load résumé %s: %s", record["id"], e)
+            rows.append(_row(str(record["id"]), None, None, [], [], str(e)))
+
+    if not texts:
+        return [], rows
+
+    try:
+        rows.extend(_score_texts(ids, texts))
+        return ids, rows
+    except Exception as e:
+        # One bad document should not fail the healthy ones batched with it
+        logger.warning(
+            "Batched scoring of %s résumés failed, retrying one at a time: %s",
+            len(ids),
+            e,
+        )
+
+    scored_ids = []
+    for resume_id, text in zip(ids, texts):
+        try:
+            rows.extend(_score_texts([resume_id], [text]))
+            scored_ids.append(resume_id)
+        except Exception as e:
+            logger.error("Failed to score résumé %s: %s", resume_id, e)
+            rows.append(_row(resume_id, None, None, [], [], str(e)))
+    return scored_ids, rows
+
+
+def _row(resume_id, job_id, similarity, resume_skills, matched_skills, error):
+    # Every row has the same keys so Parquet parts share one schema
+    return {
+        "resumeId": resume_id,
+        "jobId": job_id,
+        "similarity": similarity,
+        "resumeSkills": resume_skills,
+        "matchedSkills": matched_skills,
+        "error": error,
+    }
+
+
+# --- Output writing ---
+class JsonlWriter:
+    """Appends result rows to a single JSONL file."""
+
+    def __init__(self, path: Path):
+        self.file = open(path, "a", encoding="utf-8")
+
+    def write(self, rows: list[dict]):
+        self.file.writelines(json.dumps(row) + "\n" for row in rows)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """Writes each completed chunk as a part file in a Parquet dataset directory."""
+
+    def __init__(self, path: Path):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise BatchInputError(
+                "Parquet output requires pyarrow: pip install pyarrow"
+            )
+
+        self.pa, self.pq = pyarrow, pyarrow.parquet
+        self.schema = pyarrow.schema(
+            [
+                ("resumeId", pyarrow.string()),
+                ("jobId", pyarrow.string()),
+                ("similarity", pyarrow.float64()),
+                ("resumeSkills", pyarrow.list_(pyarrow.string())),
+                ("matchedSkills", pyarrow.list_(pyarrow.string())),
+                ("error", pyarrow.string()),
+            ]
+        )
+        self.path = path
+        self.path.mkdir(parents=True, exist_ok=True)
+        # Continue numbering after parts left by an earlier, interrupted run
+        self.part = len(list(self.path.glob("part-*.parquet")))
+
+    def write(self, rows: list[dict]):
+        if not rows:
+            return
+        table = self.pa.Table.from_pylist(rows, schema=self.schema)
+        self.pq.write_table(table, self.path / f"part-{self.part:05d}.parquet")
+        self.part += 1
+
+    def close(self):
+        pass
+
+
+# --- Checkpointing ---
+def load_checkpoint(path: Path) -> set[str]:
+    if not path.exists():
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+def append_checkpoint(path: Path, ids: list[str]):
+    with open(path, "a", encoding="utf-8") as f:
+        f.writelines(f"{resume_id}\n" for resume_id in ids)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# --- Batch run ---
+def run_batch(
+    resumes_path: Path,
+    jobs_path: Path,
+    output_path: Path,
+    output_format: str = "jsonl",
+    workers: int = DEFAULT_WORKERS,
+    chunk_size: int = 32,
+    checkpoint_path: Path | None = None,
+) -> int:
+    """
+    Scores every résumé against every job description and writes the results.
+    Output is written before the checkpoint, so a crash can repeat at most the
+    chunks that were in flight, never lose them. Returns the résumés scored.
+    """
+    checkpoint_path = checkpoint_path or Path(f"{output_path}.checkpoint")
+    done = load_checkpoint(checkpoint_path)
+    if done:
+        logger.info("Resuming: %s résumés already scored", len(done))
+
+    jobs = list(iter_documents(jobs_path))
+    if not jobs:
+        raise BatchInputError(f"No job descriptions found in {jobs_path}")
+
+    writer = (
+        ParquetWriter(output_path)
+        if output_format == "parquet"
+        else JsonlWriter(output_path)
+    )
+    pending_records = (
+        r for r in iter_documents(resumes_path) if str(r["id"]) not in done
+    )
+    chunks = _chunks(pending_records, chunk_size)
+    # Bound memory by keeping only a few chunks per worker in flight
+    max_in_flight = workers * 2
+    torch_threads = max(1, (os.cpu_count() or 1) // workers)
+
+    scored = 0
+    start_time = time.perf_counter()
+    logger.info("Starting batch run with %s workers, %s jobs", workers, len(jobs))
+
+    # Workers log through the parent, which alone owns the rotating log file
+    mp_context = multiprocessing.get_context("spawn")
+    log_queue = mp_context.Queue()
+    log_listener = forward_worker_logs(log_queue)
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(jobs, torch_threads, log_queue),
+        ) as pool:
+            in_flight = set()
+            for chunk in islice(chunks, max_in_flight):
+                in_flight.add(pool.submit(_score_chunk, chunk))
+
+            while in_flight:
+                completed, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    scored_ids, rows = future.result()
+                    writer.write(rows)
+                    append_checkpoint(checkpoint_path, scored_ids)
+                    scored += len(scored_ids)
+
+                    next_chunk = next(chunks, None)
+                    if next_chunk:
+                        in_flight.add(pool.submit(_score_chunk, next_chunk))
+
+                elapsed = time.perf_counter() - start_time
+                logger.info(
+                    "Scored %s résumés in %.1fs (%.1f résumés/s)",
+                    scored,
+                    elapsed,
+                    scored / elapsed,
+                )
+    finally:
+        writer.close()
+        log_listener.stop()
+
+    logger.info("Batch run finished: %s résumés scored", scored)
+    return scored
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Score résumés against job descriptions without the HTTP API."
+    )
+    parser.add_argument("--resumes", type=Path, required=True, help="Dir or JSONL")
+    parser.add_argument("--jobs", type=Path, required=True, help="Dir or JSONL")
+    parser.add_argument("--output", type=Path, required=True)
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Worker processes; each loads its own models (~2 GB each)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=32)
+    parser.add_argument(
+        "--checkpoint", type=Path, help="Defaults to <output>.checkpoint"
+    )
+    args = parser.parse_args()
+
+    load_dotenv()
+    # Separate from the API server's app.log so their rollovers never collide
+    setup_logging("batch")
+
+    try:
+        run_batch(
+            args.resumes,
+            args.jobs,
+            args.output,
+            output_format=args.format,
+            workers=max(1, args.workers),
+            chunk_size=max(1, args.chunk_size),
+            checkpoint_path=args.checkpoint,
+        )
+    except BatchInputError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
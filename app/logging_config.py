@@ -1,4 +1,10 @@
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -7,21 +13,89 @@ from pathlib import Path
 log_dir = Path("logs")
 log_dir.mkdir(exist_ok=True)
 
+# Logging configuration - centralized for easy tuning
+LOGGING_CONFIG = {
+    "format": os.getenv("LOG_FORMAT", "text").lower(),  # "text" or "json"
+    "backup_count": int(os.getenv("LOG_BACKUP_COUNT", "14")),  # Days of logs kept
+}
+
+# Request ID of the request being handled, set by middleware in main.py
+request_id_var = contextvars.ContextVar("request_id", default="-")
+
+_listener = None
+
+
+class RequestIdFilter(logging.Filter):
+    """
+    Stamps each record with the current request ID.
+    Runs in the calling thread, where the request's context is still available.
+    """
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queues records without formatting them.
+    The stock QueueHandler formats the message in the calling thread; here
+    formatting is left to the background listener, off the request hot path.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        # Stage timings passed as logger.info(..., extra={"timings": {...}})
+        if hasattr(record, "timings"):
+            entry["timings"] = record.timings
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 
 # Configure root logger
-def setup_logging():
-    # Clear any existing handlers
+def setup_logging(log_name: str = "app"):
+    # Clear any existing handlers and flush a previous listener
+    _stop_listener()
     logging.getLogger().handlers.clear()
 
     # Create formatter
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
+    if LOGGING_CONFIG["format"] == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] - %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
 
-    # File handler
-    log_file = log_dir / f"app_{datetime.now().strftime('%Y%m%d')}.log"
-    file_handler = logging.FileHandler(log_file)
+    # File handler, rotated at midnight. Each process that calls this needs its
+    # own log_name, since concurrent rollovers of one file delete each other's logs
+    file_handler = logging.handlers.TimedRotatingFileHandler(
+        log_dir / f"{log_name}.log",
+        when="midnight",
+        backupCount=LOGGING_CONFIG["backup_count"],
+        encoding="utf-8",
+    )
     file_handler.setFormatter(formatter)
     file_handler.setLevel(logging.INFO)
 
@@ -30,16 +104,61 @@ def setup_logging():
     console_handler.setFormatter(formatter)
     console_handler.setLevel(logging.INFO)
 
+    # Formatting and I/O happen on the listener's background thread
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+
+    global _listener
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    _listener.start()
+
     # Configure root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.INFO)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    root_logger.addHandler(queue_handler)
+
+    _quiet_external_loggers()
+    return root_logger
+
 
+def setup_worker_logging(log_queue):
+    """
+    Configures logging in a child process, such as a batch runner worker.
+    Records are sent to the parent over a multiprocessing queue, so only the
+    parent owns the rotating log file and rollovers never race each other.
+    """
+    _stop_listener()
+    logging.getLogger().handlers.clear()
+
+    # The stock QueueHandler formats records so they can be pickled
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    _quiet_external_loggers()
+    return root_logger
+
+
+def forward_worker_logs(log_queue):
+    """
+    Starts a listener in the parent that feeds worker records into its own
+    logging handlers. The caller stops it once the workers have exited.
+    """
+    listener = logging.handlers.QueueListener(log_queue, *logging.getLogger().handlers)
+    listener.start()
+    return listener
+
+
+def _quiet_external_loggers():
     # Set log level for external libraries
     logging.getLogger("httpx").setLevel(logging.WARNING)
     logging.getLogger("httpcore").setLevel(logging.WARNING)
     logging.getLogger("openai").setLevel(logging.WARNING)
     logging.getLogger("urllib3").setLevel(logging.WARNING)
 
-    return root_logger
+
+# Drain queued records on interpreter shutdown
+atexit.register(_stop_listener)
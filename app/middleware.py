@@ -0,0 +1,60 @@
+"""
+ASGI middleware for the FastAPI application.
+
+These are plain ASGI classes rather than @app.middleware("http") functions so
+they can be registered inside CORSMiddleware; responses they produce on their
+own (such as early rejections) then still carry CORS headers.
+"""
+
+import logging
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+
+logger = logging.getLogger(__name__)
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Rejects uploads to the given path whose body exceeds max_bytes with a 413.
+    A too-large Content-Length is rejected before any body is read. Bodies
+    without one (chunked uploads) are counted as they stream in and aborted
+    as soon as they pass the cap, so the multipart parser never spools more
+    than max_bytes.
+    """
+
+    def __init__(self, app, path: str, max_bytes: int):
+        self.app = app
+        self.path = path
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length", "")
+        if content_length.isdigit() and int(content_length) > self.max_bytes:
+            logger.warning("Rejected upload of %s bytes", content_length)
+            response = JSONResponse(
+                status_code=413, content={"detail": "File exceeds the upload limit."}
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    logger.warning("Aborted upload after %s bytes", received)
+                    # FastAPI re-raises HTTPExceptions from body parsing as-is
+                    raise HTTPException(
+                        status_code=413, detail="File exceeds the upload limit."
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,241 @@
+"""
+Schedules CPU-bound model calls across interactive and batch traffic.
+
+Every model call made by an endpoint goes through a single RequestScheduler.
+It limits how many calls run at once, serves interactive requests before
+batch ones, caps in-flight requests per client, drops queued requests whose
+deadline has passed, and sheds load with 429/503 rejections instead of
+letting the queue grow without bound.
+"""
+
+import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
+import logging
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Priority classes - lower value is served first
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_CLASSES = {"interactive": INTERACTIVE, "batch": BATCH}
+
+# Scheduler configuration - centralized for easy tuning
+SCHEDULER_CONFIG = {
+    "max_concurrency": int(os.getenv("SCHEDULER_MAX_CONCURRENCY", "2")),
+    "max_queue_size": int(os.getenv("SCHEDULER_MAX_QUEUE_SIZE", "32")),
+    "per_client_limit": int(os.getenv("SCHEDULER_PER_CLIENT_LIMIT", "4")),
+    "default_timeout": float(os.getenv("SCHEDULER_DEFAULT_TIMEOUT", "60")),
+}
+
+
+class RequestRejected(Exception):
+    """
+    Raised when the scheduler refuses or drops a request.
+    Carries the HTTP status code and Retry-After hint for the endpoint to return.
+    """
+
+    def __init__(self, status_code: int, detail: str, retry_after: int = 1):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    """A queued request waiting for a free execution slot."""
+
+    __slots__ = ("priority", "seq", "client_id", "deadline", "future")
+
+    def __init__(self, priority, seq, client_id, deadline, future):
+        self.priority = priority
+        self.seq = seq
+        self.client_id = client_id
+        self.deadline = deadline
+        self.future = future
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class RequestScheduler:
+    """
+    Priority queue in front of a fixed number of execution slots.
+    Work runs on the scheduler's own thread pool, one thread per slot, so the
+    event loop stays responsive and model calls never wait behind unrelated
+    work in the loop's default executor.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = SCHEDULER_CONFIG["max_concurrency"],
+        max_queue_size: int = SCHEDULER_CONFIG["max_queue_size"],
+        per_client_limit: int = SCHEDULER_CONFIG["per_client_limit"],
+        default_timeout: float = SCHEDULER_CONFIG["default_timeout"],
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self.per_client_limit = per_client_limit
+        self.default_timeout = default_timeout
+
+        self._running = 0
+        self._queue: list[_Waiter] = []
+        self._client_counts: dict[str, int] = defaultdict(int)
+        self._seq = itertools.count()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="scheduler"
+        )
+
+    def stats(self) -> dict:
+        """Returns a snapshot of scheduler load for logging and health checks."""
+        return {
+            "running": self._running,
+            "queued": sum(1 for w in self._queue if not w.future.done()),
+            "clients": len(self._client_counts),
+        }
+
+    async def run(
+        self,
+        func,
+        *args,
+        client_id: str = "unknown",
+        priority: int = INTERACTIVE,
+        timeout: float | None = None,
+        **kwargs,
+    ):
+        """
+        Runs func(*args, **kwargs) in a worker thread once a slot is free.
+        Raises RequestRejected if the client is over quota (429), the queue is
+        full (503), or the deadline passes while the request is queued (503).
+        """
+        deadline = time.monotonic() + (timeout or self.default_timeout)
+
+        if self._client_counts[client_id] >= self.per_client_limit:
+            logger.warning("Client %s exceeded concurrency quota", client_id)
+            raise RequestRejected(429, "Too many concurrent requests from this client.")
+
+        self._client_counts[client_id] += 1
+        try:
+            await self._acquire(client_id, priority, deadline)
+        except BaseException:
+            self._release_client(client_id)
+            raise
+
+        # The slot and quota are held until the thread finishes, not until this
+        # coroutine does: a cancelled request cannot stop a running model call
+        context = contextvars.copy_context()
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(context.run, func, *args, **kwargs)
+        )
+        future.add_done_callback(lambda f: self._finish(client_id, f))
+        return await asyncio.shield(future)
+
+    def _finish(self, client_id: str, future: asyncio.Future):
+        """Frees the slot and quota held by a finished worker thread."""
+        if not future.cancelled() and future.exception() is not None:
+            # Mark the error as retrieved when its request was already cancelled
+            logger.debug("Scheduled call failed: %s", future.exception())
+        self._release()
+        self._release_client(client_id)
+
+    def _release_client(self, client_id: str):
+        self._client_counts[client_id] -= 1
+        if not self._client_counts[client_id]:
+            del self._client_counts[client_id]
+
+    async def _acquire(self, client_id: str, priority: int, deadline: float):
+        """Takes a free slot immediately, or queues until one is handed over."""
+        self._drop_expired()
+        if self._running < self.max_concurrency and not self._queue:
+            self._running += 1
+            return
+
+        if len(self._queue) >= self.max_queue_size and not self._shed_for(priority):
+            logger.warning(
+                "Scheduler queue full (%s), rejecting request", len(self._queue)
+            )
+            raise RequestRejected(503, "Server is busy. Please try again later.", 5)
+
+        waiter = _Waiter(
+            priority,
+            next(self._seq),
+            client_id,
+            deadline,
+            asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(self._queue, waiter)
+
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(waiter.future), deadline - time.monotonic()
+            )
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            raise RequestRejected(503, "Request deadline exceeded while queued.")
+        except asyncio.CancelledError:
+            # Client disconnected while queued
+            self._abandon(waiter)
+            raise
+
+    def _abandon(self, waiter: _Waiter):
+        """Gives back a slot that was granted just as its waiter gave up."""
+        future = waiter.future
+        if not future.done():
+            future.cancel()
+        elif not future.cancelled() and future.exception() is None:
+            self._release()
+
+    def _release(self):
+        """Hands the freed slot to the next live waiter, or frees it."""
+        self._drop_expired()
+        while self._queue:
+            waiter = heapq.heappop(self._queue)
+            if not waiter.future.done():
+                waiter.future.set_result(None)
+                return
+        self._running -= 1
+
+    def _drop_expired(self):
+        """Removes waiters that were cancelled or whose deadline has passed."""
+        now = time.monotonic()
+        live = []
+        for waiter in self._queue:
+            if waiter.future.done():
+                continue
+            if waiter.deadline <= now:
+                waiter.future.set_exception(
+                    RequestRejected(503, "Request deadline exceeded while queued.")
+                )
+                continue
+            live.append(waiter)
+        if len(live) != len(self._queue):
+            heapq.heapify(live)
+            self._queue = live
+
+    def _shed_for(self, priority: int) -> bool:
+        """
+        Makes room for a new request by dropping the newest queued request of a
+        strictly lower priority. Returns False if nothing could be shed.
+        """
+        victims = [w for w in self._queue if w.priority > priority]
+        if not victims:
+            return False
+
+        victim = max(victims, key=lambda w: (w.priority, w.seq))
+        self._queue.remove(victim)
+        heapq.heapify(self._queue)
+        victim.future.set_exception(
+            RequestRejected(503, "Request shed to make room for higher priority work.")
+        )
+        logger.info("Shed queued request from client %s", victim.client_id)
+        return True
+
+
+# --- Shared scheduler instance for all model calls ---
+scheduler = RequestScheduler()
@@ -52,9 +52,9 @@ if use_lightweight_models or not openai_api_key:
         )
         use_openai = False
         openai_client = None
-        logger.debug(f"Loaded local GenAI model: {genai_model_name}")
+        logger.debug("Loaded local GenAI model: %s", genai_model_name)
     except Exception as e:
-        logger.error(f"Failed to load local GenAI model: {str(e)}")
+        logger.error("Failed to load local GenAI model: %s", e)
         # Graceful degradation: if model loading fails, we can still provide basic responses
         genai_pipeline = None
         use_openai = False
@@ -83,7 +83,7 @@ def _call_openai_api(prompt: str) -> str:
         # Modern API response format
         return response.choices[0].message.content.strip()
     except Exception as e:
-        logger.error(f"OpenAI API call failed: {str(e)}")
+        logger.error("OpenAI API call failed: %s", e)
         # Convert all API errors to ValueError for consistent error handling
         raise ValueError(f"GenAI API call failed: {str(e)}")
 
@@ -123,7 +123,7 @@ def _call_local_model(
         return result
 
     except Exception as e:
-        logger.error(f"Local model inference failed: {str(e)}")
+        logger.error("Local model inference failed: %s", e)
         raise ValueError(f"Local GenAI model failed: {str(e)}")
 
 
@@ -198,7 +198,7 @@ def summarize_resume(text: str) -> str:
     Generates a concise summary of the résumé highlighting key qualifications,
     experience, and skills.
     """
-    logger.debug(f"Generating résumé summary for text (length: {len(text)})")
+    logger.debug("Generating résumé summary for text (length: %s)", len(text))
 
     # Input validation - GenAI models need sufficient context to work with
     if not text or len(text.strip()) < 50:
@@ -218,11 +218,11 @@ Summary:"""  # This trailing prompt helps focus the model's response
             else _call_local_model(prompt, max_length=250)
         )
 
-        logger.info(f"Generated résumé summary (length: {len(result)})")
+        logger.info("Generated résumé summary (length: %s)", len(result))
         return result
 
     except Exception as e:
-        logger.error(f"Error in summarize_resume: {str(e)}", exc_info=True)
+        logger.error("Error in summarize_resume: %s", e, exc_info=True)
         raise ValueError(f"Résumé summarization failed: {str(e)}")
 
 
@@ -231,7 +231,7 @@ def generate_recommendations(text: str) -> List[str]:
     Analyzes the résumé and provides actionable recommendations for improvement.
     Returns a list of specific suggestions.
     """
-    logger.debug(f"Generating recommendations for text (length: {len(text)})")
+    logger.debug("Generating recommendations for text (length: %s)", len(text))
 
     if not text or len(text.strip()) < 50:
         raise ValueError("Résumé text too short for meaningful recommendations")
@@ -267,11 +267,11 @@ Please provide your recommendations in list format:
         # POST-PROCESSING: Let robust parser handle whatever format the model returned
         recommendations = parse_bulleted_list(result, max_items=8)
 
-        logger.info(f"Generated {len(recommendations)} recommendations")
+        logger.info("Generated %s recommendations", len(recommendations))
         return recommendations
 
     except Exception as e:
-        logger.error(f"Error in generate_recommendations: {str(e)}", exc_info=True)
+        logger.error("Error in generate_recommendations: %s", e, exc_info=True)
         raise ValueError(f"Recommendation generation failed: {str(e)}")
 
 
@@ -281,7 +281,9 @@ def analyze_discrepancies(resume_text: str, job_text: str) -> str:
     and discrepancies between required qualifications and candidate profile.
     """
     logger.debug(
-        f"Analyzing discrepancies between résumé ({len(resume_text)}) and job description ({len(job_text)})"
+        "Analyzing discrepancies between résumé (%s) and job description (%s)",
+        len(resume_text),
+        len(job_text),
     )
 
     # Validate both inputs - comparative analysis needs both documents
@@ -313,9 +315,9 @@ Key discrepancies and gaps:
             else _call_local_model(prompt, max_length=420)
         )
 
-        logger.info(f"Generated discrepancy analysis (length: {len(result)})")
+        logger.info("Generated discrepancy analysis (length: %s)", len(result))
         return result
 
     except Exception as e:
-        logger.error(f"Error in analyze_discrepancies: {str(e)}", exc_info=True)
+        logger.error("Error in analyze_discrepancies: %s", e, exc_info=True)
         raise ValueError(f"Discrepancy analysis failed: {str(e)}")
@@ -25,7 +25,7 @@ else:  # Full-powered local development or production
     logger.info("Using full-powered NER model")
     ner_model_name = "Jean-Baptiste/roberta-large-ner-english"
 
-logger.debug(f"Loading NER model: {ner_model_name}")
+logger.debug("Loading NER model: %s", ner_model_name)
 ner_pipeline = pipeline(
     "ner", model=ner_model_name, tokenizer=ner_model_name, grouped_entities=True
 )
@@ -63,7 +63,7 @@ def extract_skills(text: str) -> list[dict]:
     Extracts named entities from text using a pretrained NER model.
     Returns a list of entities with labels and confidence scores.
     """
-    logger.debug(f"Extracting skills from text (length: {len(text)})")
+    logger.debug("Extracting skills from text (length: %s)", len(text))
 
     try:
         # No gradients since we are doing inference, not training.
@@ -71,14 +71,40 @@ def extract_skills(text: str) -> list[dict]:
             logger.debug("Running NER pipeline...")
             raw_entities = ner_pipeline(text)
 
-        logger.debug(f"Found {len(raw_entities)} raw entities")
+        logger.debug("Found %s raw entities", len(raw_entities))
         filtered_entities = filter_skill_entities(raw_entities)
-        logger.debug(f"After filtering: {len(filtered_entities)} entities")
+        logger.debug("After filtering: %s entities", len(filtered_entities))
 
         result = [sanitize_entity(e) for e in filtered_entities]
-        logger.info(f"Extracted {len(result)} skills from text")
+        logger.info("Extracted %s skills from text", len(result))
         return result
 
     except Exception as e:
-        logger.error(f"Error in extract_skills: {str(e)}", exc_info=True)
+        logger.error("Error in extract_skills: %s", e, exc_info=True)
+        raise ValueError(f"NER model inference failed: {str(e)}")
+
+
+def extract_skills_batch(texts: list[str], batch_size: int = 8) -> list[list[dict]]:
+    """
+    Extracts skills from many texts with batched NER model calls.
+    Returns one list of entities per input text, in input order.
+    """
+    logger.debug("Extracting skills from %s texts", len(texts))
+
+    if not texts:
+        return []
+
+    try:
+        with torch.no_grad():
+            raw_batches = ner_pipeline(texts, batch_size=batch_size)
+
+        result = [
+            [sanitize_entity(e) for e in filter_skill_entities(raw_entities)]
+            for raw_entities in raw_batches
+        ]
+        logger.info("Extracted skills from %s texts", len(result))
+        return result
+
+    except Exception as e:
+        logger.error("Error in extract_skills_batch: %s", e, exc_info=True)
         raise ValueError(f"NER model inference failed: {str(e)}")
@@ -3,31 +3,223 @@ Handles PDF parsing and text extraction using pdfplumber.
 
 This module provides utility functions to extract raw text from
 PDF résumé files for further processing by downstream AI models.
+Uploads are checked for size, PDF magic bytes and page count before any
+text is extracted. The API parses each upload in a child process that is
+killed once it exceeds the parse time budget or its request is cancelled.
 """
 
+import asyncio
+import io
 import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
 import pdfplumber
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdftypes import resolve1
 
 logger = logging.getLogger(__name__)
 
+# Upload limits - centralized for easy tuning
+PDF_CONFIG = {
+    "max_upload_bytes": int(float(os.getenv("MAX_UPLOAD_MB", "10")) * 1024 * 1024),
+    "max_pages": int(os.getenv("MAX_PDF_PAGES", "20")),
+    "parse_time_budget": float(os.getenv("PDF_PARSE_TIME_BUDGET", "10")),  # Seconds
+    "max_concurrent_parses": int(os.getenv("MAX_CONCURRENT_PARSES", "2")),
+}
+
+# PDF header; readers accept it anywhere in the first 1 KB of the file
+PDF_MAGIC = b"%PDF-"
+
+
+class DocumentTooLargeError(ValueError):
+    """Raised when an upload exceeds the size or page limit."""
+
+
+class UnsupportedDocumentError(ValueError):
+    """Raised when an upload is not a PDF."""
+
+
+class DocumentParseTimeoutError(ValueError):
+    """Raised when text extraction exceeds the parse time budget."""
+
+
+class DocumentParserBusyError(Exception):
+    """Raised when every parse slot is taken; the upload can be retried later."""
+
+
+def validate_upload(upload) -> None:
+    """
+    Checks an uploaded file's size and PDF magic bytes before it is parsed.
+    The request body is already capped by UploadSizeLimitMiddleware while it
+    streams in, and Starlette spools it to a temporary file, so this reuses
+    that file instead of copying it again.
+    """
+    max_bytes = PDF_CONFIG["max_upload_bytes"]
+    if upload.size is not None and upload.size > max_bytes:
+        raise DocumentTooLargeError(
+            f"File exceeds the {max_bytes // (1024 * 1024)} MB upload limit"
+        )
+
+    upload.file.seek(0)
+    header = upload.file.read(1024)
+    upload.file.seek(0)
+    if PDF_MAGIC not in header:
+        raise UnsupportedDocumentError("Uploaded file is not a PDF")
+
+    logger.debug("Validated upload %s (%s bytes)", upload.filename, upload.size)
+
+
+def _declared_page_count(stream) -> int:
+    """
+    Returns the page count declared in the PDF's page tree root (/Count).
+    Reads it with pdfminer directly: pdfplumber builds a Page object for every
+    page as soon as pdf.pages is touched, including when the PDF is closed.
+    """
+    document = PDFDocument(PDFParser(stream))
+    page_count = resolve1(resolve1(document.catalog["Pages"])["Count"])
+    stream.seek(0)
+    if not isinstance(page_count, int) or page_count < 0:
+        raise ValueError(f"PDF declares an invalid page count: {page_count!r}")
+    return page_count
+
 
 def extract_text(file):
     filename = getattr(file, "filename", "unknown_file")
-    logger.debug(f"Starting PDF text extraction for file: {filename}")
+    logger.debug("Starting PDF text extraction for file: %s", filename)
+
+    max_pages = PDF_CONFIG["max_pages"]
+    deadline = time.monotonic() + PDF_CONFIG["parse_time_budget"]
 
     try:
+        # Reject on the declared page count before pdfplumber builds any pages
+        page_count = _declared_page_count(file.file)
+        if page_count > max_pages:
+            raise DocumentTooLargeError(
+                f"PDF has {page_count} pages; the limit is {max_pages}"
+            )
+
         with pdfplumber.open(file.file) as pdf:
-            logger.debug(f"PDF opened successfully. Pages: {len(pdf.pages)}")
+            logger.debug("PDF opened successfully. Pages: %s", page_count)
 
-            result = "\n".join(
-                page.extract_text() for page in pdf.pages if page.extract_text()
-            )
+            page_texts = []
+            for page_number, page in enumerate(pdf.pages):
+                # Cooperative cancellation: stop between pages once over budget
+                if time.monotonic() > deadline:
+                    raise DocumentParseTimeoutError(
+                        "PDF took too long to parse; "
+                        f"stopped after {page_number} of {page_count} pages"
+                    )
+                page_text = page.extract_text()
+                if page_text:
+                    page_texts.append(page_text)
+                # Release the page's parsed objects as soon as we are done with it
+                page.close()
 
-            logger.info(f"Successfully extracted {len(result)} characters from PDF")
+            result = "\n".join(page_texts)
+
+            logger.info("Successfully extracted %s characters from PDF", len(result))
             return result
 
+    except (DocumentTooLargeError, DocumentParseTimeoutError):
+        raise
     except Exception as e:
         logger.error(
-            f"Error extracting text from PDF {filename}: {str(e)}", exc_info=True
+            "Error extracting text from PDF %s: %s", filename, e, exc_info=True
         )
         raise ValueError(f"Failed to extract text from PDF: {str(e)}")
+
+
+# --- Isolated parsing for the API ---
+# Parsing runs in a child process so it can be killed mid-page, which the
+# cooperative deadline in extract_text cannot do. forkserver starts children
+# from a clean server process with pdfplumber preloaded; forking the API
+# process itself would copy its threads and loaded models.
+_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+_mp_context = multiprocessing.get_context(_START_METHOD)
+if _START_METHOD == "forkserver":
+    _mp_context.set_forkserver_preload([__name__])
+
+_parse_slots = asyncio.Semaphore(PDF_CONFIG["max_concurrent_parses"])
+# Threads that wait for a child's result, one per parse slot
+_parse_waiters = ThreadPoolExecutor(
+    max_workers=PDF_CONFIG["max_concurrent_parses"], thread_name_prefix="pdf-parse"
+)
+
+
+def _parse_in_child(sender, filename: str, data: bytes):
+    """Child process entry point: sends back ("ok", text) or ("error", error)."""
+    try:
+        text = extract_text(SimpleNamespace(filename=filename, file=io.BytesIO(data)))
+        sender.send(("ok", text))
+    except Exception as e:
+        sender.send(("error", e))
+    finally:
+        sender.close()
+
+
+def _wait_for_child(receiver, process):
+    """Blocks until the child sends its result or exits, then reaps it."""
+    try:
+        return receiver.recv()
+    except EOFError:
+        # The child was killed or crashed before sending a result
+        return None
+    finally:
+        receiver.close()
+        process.join()
+
+
+async def extract_text_isolated(upload) -> str:
+    """
+    Extracts text from an upload in a child process, for use by the API.
+    The child is killed once it runs past the parse time budget (raising
+    DocumentParseTimeoutError) or when the awaiting request is cancelled.
+    Raises DocumentParserBusyError instead of queueing when every parse slot
+    is taken, so a burst of uploads cannot pile up behind slow documents.
+    """
+    if _parse_slots.locked():
+        raise DocumentParserBusyError("Too many documents are being parsed.")
+
+    async with _parse_slots:
+        upload.file.seek(0)
+        # Bounded by the upload size limit; the child needs its own copy
+        data = upload.file.read()
+        upload.file.seek(0)
+
+        receiver, sender = _mp_context.Pipe(duplex=False)
+        process = _mp_context.Process(
+            target=_parse_in_child,
+            args=(sender, upload.filename, data),
+            daemon=True,
+        )
+        process.start()
+        sender.close()
+
+        budget = PDF_CONFIG["parse_time_budget"]
+        waiter = asyncio.get_running_loop().run_in_executor(
+            _parse_waiters, _wait_for_child, receiver, process
+        )
+        try:
+            result = await asyncio.wait_for(asyncio.shield(waiter), budget)
+        except asyncio.TimeoutError:
+            raise DocumentParseTimeoutError(
+                f"PDF took longer than {budget:g}s to parse"
+            )
+        finally:
+            # Ends the child on timeout or cancellation; the waiter thread
+            # then sees the closed pipe and reaps it
+            if process.is_alive():
+                process.kill()
+
+    if result is None:
+        raise ValueError("PDF parser exited before returning any text")
+    status, payload = result
+    if status == "error":
+        raise payload
+    return payload
@@ -0,0 +1,188 @@
+"""
+Provides two-stage candidate ranking for résumé shortlists.
+
+This module ranks many résumés against one job description. The fast
+bi-encoder from similarity_service scores every résumé, and an optional local
+cross-encoder then rescores the top-N hits to produce a more precise top-k.
+"""
+
+import logging
+import os
+import time
+from sentence_transformers import CrossEncoder
+import torch
+
+from app.services.similarity_service import compute_similarity_scores
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# --- Configure reranking based on environment ---
+use_lightweight_models = os.getenv("LIGHTWEIGHT_MODELS", "false").lower() == "true"
+enable_reranking = os.getenv("ENABLE_RERANKING", "false").lower() == "true"
+
+# Reranking configuration - centralized for easy tuning
+RERANK_CONFIG = {
+    "top_n": int(os.getenv("RERANK_TOP_N", "50")),  # Bi-encoder hits to rescore
+    "batch_size": int(os.getenv("RERANK_BATCH_SIZE", "16")),  # Pairs per forward pass
+    "time_budget": float(os.getenv("RERANK_TIME_BUDGET", "2.0")),  # Seconds
+    "max_length": 512,  # Token limit for each job/résumé pair
+    "max_resumes": int(os.getenv("RANK_MAX_RESUMES", "500")),  # Per /rank-resumes call
+}
+
+if enable_reranking:
+    if use_lightweight_models:  # Used primarily for demo hosting
+        logger.info("Using lightweight cross-encoder for constrained environments")
+        rerank_model_name = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    else:  # Full-powered local development or production
+        logger.info("Using full-powered cross-encoder")
+        rerank_model_name = "cross-encoder/ms-marco-MiniLM-L-12-v2"
+
+    try:
+        logger.debug("Loading cross-encoder model: %s", rerank_model_name)
+        rerank_model = CrossEncoder(
+            rerank_model_name, max_length=RERANK_CONFIG["max_length"]
+        )
+    except Exception as e:
+        logger.error("Failed to load cross-encoder model: %s", e)
+        # Graceful degradation: fall back to bi-encoder ranking only
+        rerank_model = None
+else:
+    logger.info("Cross-encoder reranking disabled")
+    rerank_model = None
+
+
+# --- Helper functions for reranking ---
+def _rerank_candidates(
+    job_text: str, candidates: list[dict], batch_size: int, time_budget: float
+) -> int:
+    """
+    Rescores candidates in place with the cross-encoder, in bi-encoder order.
+    Stops before a batch that would likely exceed the time budget, so the
+    strongest bi-encoder hits are always the ones that get rescored.
+    Returns the number of candidates that were rescored.
+    """
+    start_time = time.perf_counter()
+    last_batch_time = 0.0
+    rescored = 0
+
+    for i in range(0, len(candidates), batch_size):
+        elapsed = time.perf_counter() - start_time
+        if rescored and elapsed + last_batch_time > time_budget:
+            logger.warning(
+                "Rerank time budget of %.2fs reached after %s/%s candidates",
+                time_budget,
+                rescored,
+                len(candidates),
+            )
+            break
+
+        batch = candidates[i : i + batch_size]
+        batch_start = time.perf_counter()
+        with torch.no_grad():
+            scores = rerank_model.predict(
+                [(job_text, c["text"]) for c in batch],
+                batch_size=batch_size,
+                show_progress_bar=False,
+            )
+        last_batch_time = time.perf_counter() - batch_start
+
+        for candidate, score in zip(batch, scores):
+            candidate["rerankScore"] = float(score)
+        rescored += len(batch)
+
+    return rescored
+
+
+# --- Two-stage ranking ---
+def rank_resumes(
+    job_text: str,
+    resumes: list[dict],
+    top_k: int = 10,
+    rerank: bool = True,
+    top_n: int | None = None,
+) -> dict:
+    """
+    Ranks résumés against a job description and returns the top-k.
+    Each résumé is a dict with "id" and "text". When reranking is enabled, the
+    top-N bi-encoder hits are rescored by the cross-encoder within the
+    configured latency budget; any that were not reached keep their
+    bi-encoder order behind the rescored ones.
+    """
+    top_n = top_n or RERANK_CONFIG["top_n"]
+    logger.debug(
+        "Ranking %s résumés (top_k: %s, top_n: %s, rerank: %s)",
+        len(resumes),
+        top_k,
+        top_n,
+        rerank,
+    )
+
+    if not job_text or not resumes:
+        raise ValueError("Job description and at least one résumé are required")
+    if top_k < 1:
+        raise ValueError("top_k must be at least 1")
+
+    try:
+        # Stage 1: bi-encoder similarity over every résumé
+        start_time = time.perf_counter()
+        scores = compute_similarity_scores(job_text, [r["text"] for r in resumes])
+        candidates = sorted(
+            (
+                {"id": r["id"], "text": r["text"], "similarity": score}
+                for r, score in zip(resumes, scores)
+            ),
+            key=lambda c: c["similarity"],
+            reverse=True,
+        )
+        bi_encoder_time = time.perf_counter() - start_time
+
+        # Stage 2: cross-encoder rescoring of the shortlist
+        rescored = 0
+        cross_encoder_time = 0.0
+        if rerank and rerank_model is not None:
+            shortlist = candidates[: max(top_n, top_k)]
+            start_time = time.perf_counter()
+            rescored = _rerank_candidates(
+                job_text,
+                shortlist,
+                RERANK_CONFIG["batch_size"],
+                RERANK_CONFIG["time_budget"],
+            )
+            cross_encoder_time = time.perf_counter() - start_time
+            candidates = (
+                sorted(shortlist[:rescored], key=lambda c: -c["rerankScore"])
+                + candidates[rescored:]
+            )
+        elif rerank:
+            logger.warning("Reranking requested but no cross-encoder is loaded")
+
+        results = [
+            {
+                "id": c["id"],
+                "rank": rank,
+                "similarity": c["similarity"],
+                "rerankScore": c.get("rerankScore"),
+            }
+            for rank, c in enumerate(candidates[:top_k], start=1)
+        ]
+
+        logger.info(
+            "Ranked %s résumés, reranked %s. Bi-encoder: %.3fs, cross-encoder: %.3fs",
+            len(resumes),
+            rescored,
+            bi_encoder_time,
+            cross_encoder_time,
+        )
+        return {
+            "results": results,
+            "reranked": rescored,
+            "timings": {
+                "biEncoder": bi_encoder_time,
+                "crossEncoder": cross_encoder_time,
+            },
+        }
+
+    except Exception as e:
+        logger.error("Error in rank_resumes: %s", e, exc_info=True)
+        raise ValueError(f"Résumé ranking failed: {str(e)}")
@@ -24,7 +24,7 @@ else:  # Full-powered local development or production
     logger.info("Using full-powered similarity model")
     similarity_model_name = "sentence-transformers/all-MiniLM-L6-v2"
 
-logger.debug(f"Loading similarity model: {similarity_model_name}")
+logger.debug("Loading similarity model: %s", similarity_model_name)
 similarity_model = SentenceTransformer(similarity_model_name)
 
 
@@ -39,7 +39,7 @@ def compute_similarity(resume_text: str, job_text: str) -> float:
     try:
         # Encode the texts to get their embeddings
         embeddings = similarity_model.encode([resume_text, job_text])
-        logger.debug(f"Generated embeddings of shape: {[e.shape for e in embeddings]}")
+        logger.debug("Generated embeddings of shape: %s", [e.shape for e in embeddings])
 
         if not all(len(vec) > 0 for vec in embeddings):
             logger.error("Embedding failed: one or both texts returned empty vectors")
@@ -57,9 +57,55 @@ def compute_similarity(resume_text: str, job_text: str) -> float:
             )
 
         similarity = float(dot_product / norm_product)
-        logger.info(f"Computed similarity score: {similarity:.3f}")
+        logger.info("Computed similarity score: %.3f", similarity)
         return similarity
 
     except Exception as e:
-        logger.error(f"Error in compute_similarity: {str(e)}", exc_info=True)
+        logger.error("Error in compute_similarity: %s", e, exc_info=True)
         raise ValueError(f"Similarity computation failed: {str(e)}")
+
+
+# --- Batched similarity scoring for candidate ranking ---
+def compute_similarity_matrix(
+    resume_texts: list[str], job_texts: list[str], batch_size: int = 32
+) -> np.ndarray:
+    """
+    Computes cosine similarity between every résumé and every job description.
+    Each text is encoded once, in batches, so this is much cheaper than calling
+    compute_similarity for every pair. Returns a (résumés x jobs) matrix.
+    """
+    logger.debug(
+        "Computing similarity matrix for %s résumés and %s job descriptions",
+        len(resume_texts),
+        len(job_texts),
+    )
+
+    if not resume_texts or not job_texts:
+        return np.zeros((len(resume_texts), len(job_texts)), dtype=np.float32)
+
+    try:
+        # Normalized embeddings turn cosine similarity into a plain dot product
+        resume_embeddings = similarity_model.encode(
+            resume_texts, batch_size=batch_size, normalize_embeddings=True
+        )
+        job_embeddings = similarity_model.encode(
+            job_texts, batch_size=batch_size, normalize_embeddings=True
+        )
+
+        matrix = np.asarray(resume_embeddings) @ np.asarray(job_embeddings).T
+        logger.info("Computed similarity matrix of shape %s", matrix.shape)
+        return matrix
+
+    except Exception as e:
+        logger.error("Error in compute_similarity_matrix: %s", e, exc_info=True)
+        raise ValueError(f"Similarity scoring failed: {str(e)}")
+
+
+def compute_similarity_scores(
+    job_text: str, resume_texts: list[str], batch_size: int = 32
+) -> list[float]:
+    """
+    Computes cosine similarity between one job description and many résumés.
+    """
+    matrix = compute_similarity_matrix(resume_texts, [job_text], batch_size)
+    return [float(score) for score in matrix[:, 0]]
@@ -0,0 +1,137 @@
+"""
+Warms up and self-tests the AI models before the app starts serving.
+
+Tokenizer setup, torch kernel selection and lazy allocations otherwise land on
+the first real request. This module runs representative inputs of several
+lengths through each loaded model, records how long each run took, and raises
+if a model returns malformed output so a broken deploy fails at startup.
+"""
+
+import logging
+import os
+import time
+import numpy as np
+import torch
+
+from app.services.ner_service import ner_pipeline
+from app.services.similarity_service import similarity_model
+from app.services import genai_service, rerank_service
+
+logger = logging.getLogger(__name__)
+
+# Warm-up configuration - centralized for easy tuning
+WARMUP_CONFIG = {
+    "enabled": os.getenv("WARMUP_ENABLED", "true").lower() == "true",
+    # Input sizes in characters; cover short snippets up to full résumés
+    "lengths": [
+        int(n) for n in os.getenv("WARMUP_LENGTHS", "200,1000,4000").split(",")
+    ],
+    "genai_max_length": 32,  # Keep local generation short, it is only a warm-up
+}
+
+# Representative résumé-style text, repeated to reach each target length
+SAMPLE_TEXT = (
+    "Software engineer with five years of experience building Python and "
+    "FastAPI services on AWS. Skilled in PyTorch, Docker, PostgreSQL and React. "
+    "Led migration of a monolith to microservices at Acme Corporation in Boston. "
+)
+
+# Timings from the most recent warm-up, keyed by model then input length
+warmup_timings: dict[str, dict[int, float]] = {}
+
+
+def _sample(length: int) -> str:
+    repeats = length // len(SAMPLE_TEXT) + 1
+    return (SAMPLE_TEXT * repeats)[:length]
+
+
+# --- Output validation for each model ---
+def _check_ner(output) -> None:
+    if not isinstance(output, list):
+        raise RuntimeError(f"NER model returned {type(output).__name__}, not list")
+    for entity in output:
+        if not {"entity_group", "score", "word"} <= set(entity):
+            raise RuntimeError(f"NER model returned malformed entity: {entity}")
+
+
+def _check_embeddings(output) -> None:
+    embeddings = np.asarray(output)
+    if embeddings.ndim != 2 or embeddings.shape[1] == 0:
+        raise RuntimeError(f"Similarity model returned shape {embeddings.shape}")
+    if not np.isfinite(embeddings).all():
+        raise RuntimeError("Similarity model returned non-finite embeddings")
+
+
+def _check_genai(output) -> None:
+    if not isinstance(output, list) or not output:
+        raise RuntimeError("GenAI model returned no outputs")
+    if not isinstance(output[0].get("generated_text"), str):
+        raise RuntimeError(f"GenAI model returned malformed output: {output[0]}")
+
+
+def _check_rerank(output) -> None:
+    scores = np.asarray(output)
+    if scores.ndim != 1 or not np.isfinite(scores).all():
+        raise RuntimeError(f"Cross-encoder returned malformed scores: {scores}")
+
+
+def _warm(name: str, run, check) -> None:
+    """Runs one model over every configured length, timing and validating it."""
+    timings = {}
+    for length in WARMUP_CONFIG["lengths"]:
+        text = _sample(length)
+        start_time = time.perf_counter()
+        with torch.no_grad():
+            output = run(text)
+        timings[length] = time.perf_counter() - start_time
+        check(output)
+        logger.info("Warm-up %s (%s chars) took %.3fs", name, length, timings[length])
+    warmup_timings[name] = timings
+
+
+# --- Warm-up entry point ---
+def run_warmup() -> dict[str, dict[int, float]]:
+    """
+    Warms up every locally loaded model and returns the recorded timings.
+    Raises RuntimeError if any model fails or produces malformed output.
+    """
+    if not WARMUP_CONFIG["enabled"]:
+        logger.info("Model warm-up disabled")
+        return warmup_timings
+
+    logger.info("Warming up models with input lengths %s", WARMUP_CONFIG["lengths"])
+    start_time = time.perf_counter()
+
+    try:
+        _warm("ner", ner_pipeline, _check_ner)
+        _warm(
+            "similarity",
+            lambda text: similarity_model.encode([text, text[: len(text) // 2]]),
+            _check_embeddings,
+        )
+
+        # Only local models need warming; the OpenAI path has nothing to load
+        if genai_service.genai_pipeline is not None:
+            _warm(
+                "genai",
+                lambda text: genai_service.genai_pipeline(
+                    text, max_length=WARMUP_CONFIG["genai_max_length"]
+                ),
+                _check_genai,
+            )
+
+        if rerank_service.rerank_model is not None:
+            _warm(
+                "rerank",
+                lambda text: rerank_service.rerank_model.predict(
+                    [(SAMPLE_TEXT, text)], show_progress_bar=False
+                ),
+                _check_rerank,
+            )
+
+    except Exception as e:
+        logger.error("Model warm-up failed: %s", e, exc_info=True)
+        raise RuntimeError(f"Model warm-up failed: {str(e)}")
+
+    logger.info("Model warm-up completed in %.2fs", time.perf_counter() - start_time)
+    return warmup_timings
@@ -12,23 +12,54 @@ load_dotenv()
 
 from fastapi import FastAPI, File, UploadFile, HTTPException, Body, Request
 from fastapi.middleware.cors import CORSMiddleware
+from pydantic import BaseModel, Field
 import os
+import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime
 
-from app.services.pdf_parser import extract_text
+from app.services.pdf_parser import (
+    extract_text_isolated,
+    validate_upload,
+    PDF_CONFIG,
+    DocumentTooLargeError,
+    UnsupportedDocumentError,
+    DocumentParseTimeoutError,
+    DocumentParserBusyError,
+)
 from app.services.ner_service import extract_skills
 from app.services.similarity_service import compute_similarity
+from app.services.rerank_service import rank_resumes, RERANK_CONFIG
 from app.services.genai_service import (
     summarize_resume,
     generate_recommendations,
     analyze_discrepancies,
 )
-from app.logging_config import setup_logging
+from app.logging_config import setup_logging, request_id_var
+from app.middleware import UploadSizeLimitMiddleware
+from app.warmup import run_warmup, warmup_timings
+from app.scheduler import scheduler, RequestRejected, PRIORITY_CLASSES, INTERACTIVE
 
 # Setup logging
 logger = setup_logging()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up models before accepting traffic; raises if a model is broken
+    run_warmup()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Added before CORSMiddleware so it runs inside it and its 413s get CORS headers.
+# Allow some slack for the multipart envelope around the file itself.
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    path="/upload-document",
+    max_bytes=PDF_CONFIG["max_upload_bytes"] + 64 * 1024,
+)
 
 cors_origins = os.getenv("CORS_ORIGINS").split(",")
 app.add_middleware(
@@ -40,32 +71,145 @@ app.add_middleware(
 )
 
 
+# --- Scheduling helpers for model calls ---
+# Requests from these addresses are from our reverse proxy (nginx on the host,
+# seen through the Docker bridge), so the real client IP comes from its headers
+trusted_proxies = set(os.getenv("TRUSTED_PROXIES", "127.0.0.1,172.17.0.1").split(","))
+
+
+def _client_ip(request: Request) -> str:
+    client_ip = request.client.host if request.client else "unknown"
+    if client_ip in trusted_proxies:
+        # The last X-Forwarded-For entry is the one our proxy appended; earlier
+        # entries come from the client and can be spoofed
+        forwarded = (
+            request.headers.get("X-Real-IP")
+            or request.headers.get("X-Forwarded-For", "").split(",")[-1]
+        )
+        client_ip = forwarded.strip() or client_ip
+    return client_ip
+
+
+def _schedule(request: Request, func, *args, **kwargs):
+    """
+    Queues a model call on the shared scheduler.
+    Clients pick a priority class with the X-Request-Priority header
+    ("interactive" or "batch") and may set a deadline in seconds with
+    X-Request-Timeout.
+    """
+    priority = PRIORITY_CLASSES.get(
+        request.headers.get("X-Request-Priority", "interactive").lower(),
+        INTERACTIVE,
+    )
+    try:
+        timeout = float(request.headers["X-Request-Timeout"])
+    except (KeyError, ValueError):
+        timeout = None
+
+    return scheduler.run(
+        func,
+        *args,
+        client_id=_client_ip(request),
+        priority=priority,
+        timeout=timeout,
+        **kwargs,
+    )
+
+
+def _rejection(e: RequestRejected) -> HTTPException:
+    logger.warning("Request rejected by scheduler (%s): %s", e.status_code, e.detail)
+    return HTTPException(
+        status_code=e.status_code,
+        detail=e.detail,
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+def _run_analysis(resume_text: str, job_text: str):
+    start_time = datetime.now()
+    resume_skills = extract_skills(resume_text)
+    job_skills = extract_skills(job_text)
+    ner_time = (datetime.now() - start_time).total_seconds()
+
+    start_time = datetime.now()
+    similarity = compute_similarity(resume_text, job_text)
+    similarity_time = (datetime.now() - start_time).total_seconds()
+
+    timings = {"ner": ner_time, "similarity": similarity_time}
+    return resume_skills, job_skills, similarity, timings
+
+
+@app.middleware("http")
+async def assign_request_id(request: Request, call_next):
+    # Tag every log line for this request; honour an ID set by the proxy
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
 @app.get("/")
 def root():
     logger.info("Root endpoint accessed")
     return {"message": "Resume Scanner API"}
 
 
+@app.get("/health")
+def health():
+    return {
+        "status": "ready",
+        "warmup": warmup_timings,
+        "scheduler": scheduler.stats(),
+    }
+
+
 @app.post("/upload-document")
 async def upload_document(document: UploadFile = File(...)):
-    logger.info(f"Document upload started: {document.filename}")
+    logger.info("Document upload started: %s", document.filename)
     try:
         start_time = datetime.now()
-        text = extract_text(document)
+        validate_upload(document)
+        # Parsed in a child process that is killed at the time budget or when
+        # the client disconnects
+        text = await extract_text_isolated(document)
         process_time = (datetime.now() - start_time).total_seconds()
 
         logger.info(
-            f"Document processed successfully: {document.filename}, "
-            f"size: {len(text)} chars, processing time: {process_time:.2f}s"
+            "Document processed successfully: %s, "
+            "size: %s chars, processing time: %.2fs",
+            document.filename,
+            len(text),
+            process_time,
+            extra={"timings": {"total": process_time}},
         )
         return {"filename": document.filename, "content": text}
 
+    except DocumentTooLargeError as e:
+        logger.warning("Document rejected as too large: %s", e)
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedDocumentError as e:
+        logger.warning("Document rejected as unsupported: %s", e)
+        raise HTTPException(status_code=415, detail=str(e))
+    except DocumentParseTimeoutError as e:
+        logger.warning("Document parse time budget exceeded: %s", e)
+        raise HTTPException(status_code=422, detail=str(e))
+    except DocumentParserBusyError as e:
+        logger.warning("Document rejected, all parse slots busy: %s", e)
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "5"}
+        )
     except ValueError as e:
-        logger.error(f"Document validation error: {str(e)}", exc_info=True)
+        logger.error("Document validation error: %s", e, exc_info=True)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(
-            f"Unexpected error processing document {document.filename}: {str(e)}",
+            "Unexpected error processing document %s: %s",
+            document.filename,
+            e,
             exc_info=True,
         )
         raise HTTPException(
@@ -79,10 +223,12 @@ async def analyze(
     resume_text: str = Body(...),
     job_text: str = Body(...),
 ):
-    client_ip = request.client.host if request.client else "unknown"
+    client_ip = _client_ip(request)
     logger.info(
-        f"Analysis request from {client_ip}. "
-        f"Resume length: {len(resume_text)}, Job description length: {len(job_text)}"
+        "Analysis request from %s. Resume length: %s, Job description length: %s",
+        client_ip,
+        len(resume_text),
+        len(job_text),
     )
 
     if not resume_text or not job_text:
@@ -91,11 +237,17 @@ async def analyze(
 
     try:
         start_time = datetime.now()
-        resume_skills = extract_skills(resume_text)
-        job_skills = extract_skills(job_text)
+        resume_skills, job_skills, similarity, timings = await _schedule(
+            request, _run_analysis, resume_text, job_text
+        )
         process_time = (datetime.now() - start_time).total_seconds()
         logger.info(
-            f"Analysis completed in {process_time:.2f}s. {len(resume_skills)} skills found in resume, {len(job_skills)} skills found in job description."
+            "Analysis completed in %.2fs. %s skills found in resume, "
+            "%s skills found in job description.",
+            process_time,
+            len(resume_skills),
+            len(job_skills),
+            extra={"timings": {"total": process_time, **timings}},
         )
 
         if not resume_skills:
@@ -103,25 +255,95 @@ async def analyze(
         if not job_skills:
             logger.warning("No skills extracted from job description")
 
-        similarity = compute_similarity(resume_text, job_text)
         return {
             "resumeSkills": resume_skills,
             "jobSkills": job_skills,
             "similarity": similarity,
         }
+    except RequestRejected as e:
+        raise _rejection(e)
     except ValueError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+class RankedResume(BaseModel):
+    id: str | int
+    text: str = Field(..., min_length=1)
+
+
+@app.post("/rank-resumes")
+async def rank_resumes_endpoint(
+    request: Request,
+    job_text: str = Body(...),
+    # Capped so one request cannot hold a scheduler slot for an unbounded encode
+    resumes: list[RankedResume] = Body(..., max_length=RERANK_CONFIG["max_resumes"]),
+    top_k: int = Body(10, ge=1),
+    top_n: int | None = Body(None, ge=1, le=RERANK_CONFIG["max_resumes"]),
+    rerank: bool = Body(True),
+):
+    client_ip = _client_ip(request)
+    logger.info(
+        "Ranking request from %s. Résumés: %s, top_k: %s, top_n: %s, rerank: %s",
+        client_ip,
+        len(resumes),
+        top_k,
+        top_n,
+        rerank,
+    )
+
+    if not job_text or not resumes:
+        logger.warning("Missing job text or résumés in ranking request")
+        raise HTTPException(
+            status_code=422,
+            detail="Job description text and at least one résumé are required.",
+        )
+
+    try:
+        start_time = datetime.now()
+        ranking = await _schedule(
+            request,
+            rank_resumes,
+            job_text,
+            [resume.model_dump() for resume in resumes],
+            top_k=top_k,
+            rerank=rerank,
+            top_n=top_n,
+        )
+        process_time = (datetime.now() - start_time).total_seconds()
+
+        logger.info(
+            "Ranking completed in %.2fs. "
+            "Bi-encoder: %.3fs, cross-encoder: %.3fs, reranked: %s",
+            process_time,
+            ranking["timings"]["biEncoder"],
+            ranking["timings"]["crossEncoder"],
+            ranking["reranked"],
+            extra={"timings": {"total": process_time, **ranking["timings"]}},
+        )
+        return ranking
+
+    except RequestRejected as e:
+        raise _rejection(e)
+    except ValueError as e:
+        logger.error("Ranking validation error: %s", e, exc_info=True)
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Unexpected error during ranking: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=500, detail="Failed to rank résumés. Please try again."
+        )
+
+
 @app.post("/summarize-resume")
 async def summarize_resume_endpoint(
     request: Request,
     resume_text: str = Body(..., embed=True),
 ):
-    client_ip = request.client.host if request.client else "unknown"
+    client_ip = _client_ip(request)
     logger.info(
-        f"Resume summarization request from {client_ip}. "
-        f"Resume length: {len(resume_text)} chars"
+        "Resume summarization request from %s. Resume length: %s chars",
+        client_ip,
+        len(resume_text),
     )
 
     if not resume_text:
@@ -130,21 +352,25 @@ async def summarize_resume_endpoint(
 
     try:
         start_time = datetime.now()
-        summary = summarize_resume(resume_text)
+        summary = await _schedule(request, summarize_resume, resume_text)
         process_time = (datetime.now() - start_time).total_seconds()
 
         logger.info(
-            f"Resume summarization completed in {process_time:.2f}s. "
-            f"Summary length: {len(summary)} chars"
+            "Resume summarization completed in %.2fs. Summary length: %s chars",
+            process_time,
+            len(summary),
+            extra={"timings": {"total": process_time}},
         )
         return {"summary": summary}
 
+    except RequestRejected as e:
+        raise _rejection(e)
     except ValueError as e:
-        logger.error(f"Resume summarization validation error: {str(e)}", exc_info=True)
+        logger.error("Resume summarization validation error: %s", e, exc_info=True)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(
-            f"Unexpected error during resume summarization: {str(e)}", exc_info=True
+            "Unexpected error during resume summarization: %s", e, exc_info=True
         )
         raise HTTPException(
             status_code=500,
@@ -157,10 +383,11 @@ async def generate_recommendations_endpoint(
     request: Request,
     resume_text: str = Body(..., embed=True),
 ):
-    client_ip = request.client.host if request.client else "unknown"
+    client_ip = _client_ip(request)
     logger.info(
-        f"Recommendations request from {client_ip}. "
-        f"Resume length: {len(resume_text)} chars"
+        "Recommendations request from %s. Resume length: %s chars",
+        client_ip,
+        len(resume_text),
     )
 
     if not resume_text:
@@ -169,23 +396,31 @@ async def generate_recommendations_endpoint(
 
     try:
         start_time = datetime.now()
-        recommendations = generate_recommendations(resume_text)
+        recommendations = await _schedule(
+            request, generate_recommendations, resume_text
+        )
         process_time = (datetime.now() - start_time).total_seconds()
 
         logger.info(
-            f"Recommendations generation completed in {process_time:.2f}s. "
-            f"Generated {len(recommendations)} recommendations"
+            "Recommendations generation completed in %.2fs. "
+            "Generated %s recommendations",
+            process_time,
+            len(recommendations),
+            extra={"timings": {"total": process_time}},
         )
         return {"recommendations": recommendations}
 
+    except RequestRejected as e:
+        raise _rejection(e)
     except ValueError as e:
         logger.error(
-            f"Recommendations generation validation error: {str(e)}", exc_info=True
+            "Recommendations generation validation error: %s", e, exc_info=True
         )
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(
-            f"Unexpected error during recommendations generation: {str(e)}",
+            "Unexpected error during recommendations generation: %s",
+            e,
             exc_info=True,
         )
         raise HTTPException(
@@ -200,10 +435,13 @@ async def analyze_discrepancies_endpoint(
     resume_text: str = Body(...),
     job_text: str = Body(...),
 ):
-    client_ip = request.client.host if request.client else "unknown"
+    client_ip = _client_ip(request)
     logger.info(
-        f"Discrepancy analysis request from {client_ip}. "
-        f"Resume length: {len(resume_text)} chars, Job description length: {len(job_text)} chars"
+        "Discrepancy analysis request from %s. "
+        "Resume length: %s chars, Job description length: %s chars",
+        client_ip,
+        len(resume_text),
+        len(job_text),
     )
 
     if not resume_text or not job_text:
@@ -215,21 +453,27 @@ async def analyze_discrepancies_endpoint(
 
     try:
         start_time = datetime.now()
-        discrepancies = analyze_discrepancies(resume_text, job_text)
+        discrepancies = await _schedule(
+            request, analyze_discrepancies, resume_text, job_text
+        )
         process_time = (datetime.now() - start_time).total_seconds()
 
         logger.info(
-            f"Discrepancy analysis completed in {process_time:.2f}s. "
-            f"Analysis length: {len(discrepancies)} chars"
+            "Discrepancy analysis completed in %.2fs. Analysis length: %s chars",
+            process_time,
+            len(discrepancies),
+            extra={"timings": {"total": process_time}},
         )
         return {"discrepancies": discrepancies}
 
+    except RequestRejected as e:
+        raise _rejection(e)
     except ValueError as e:
-        logger.error(f"Discrepancy analysis validation error: {str(e)}", exc_info=True)
+        logger.error("Discrepancy analysis validation error: %s", e, exc_info=True)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(
-            f"Unexpected error during discrepancy analysis: {str(e)}", exc_info=True
+            "Unexpected error during discrepancy analysis: %s", e, exc_info=True
         )
         raise HTTPException(
             status_code=500, detail="Failed to analyze discrepancies. Please try again."
@@ -0,0 +1,208 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.scheduler import BATCH, INTERACTIVE, RequestRejected, RequestScheduler
+
+
+def make_scheduler(**overrides):
+    config = {
+        "max_concurrency": 1,
+        "max_queue_size": 4,
+        "per_client_limit": 4,
+        "default_timeout": 5,
+    }
+    config.update(overrides)
+    return RequestScheduler(**config)
+
+
+class Blocker:
+    """Fake model call that blocks its worker thread until released."""
+
+    def __init__(self):
+        self.started = []
+        self.finished = []
+        self._events = {}
+
+    def __call__(self, name):
+        event = self._events.setdefault(name, threading.Event())
+        self.started.append(name)
+        event.wait(timeout=5)
+        self.finished.append(name)
+        return name
+
+    def release(self, name):
+        self._events.setdefault(name, threading.Event()).set()
+
+
+async def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.005)
+
+
+def test_slot_is_handed_to_next_waiter_in_priority_order():
+    async def scenario():
+        scheduler = make_scheduler()
+        blocker = Blocker()
+        first = asyncio.create_task(scheduler.run(blocker, "first", client_id="a"))
+        await wait_until(lambda: blocker.started == ["first"])
+
+        batch = asyncio.create_task(
+            scheduler.run(blocker, "batch", client_id="b", priority=BATCH)
+        )
+        interactive = asyncio.create_task(
+            scheduler.run(blocker, "interactive", client_id="c", priority=INTERACTIVE)
+        )
+        await asyncio.sleep(0.01)
+        assert scheduler.stats() == {"running": 1, "queued": 2, "clients": 3}
+
+        for name in ("first", "interactive", "batch"):
+            blocker.release(name)
+        assert await asyncio.gather(first, interactive, batch) == [
+            "first",
+            "interactive",
+            "batch",
+        ]
+        assert blocker.started == ["first", "interactive", "batch"]
+        assert scheduler.stats() == {"running": 0, "queued": 0, "clients": 0}
+
+    asyncio.run(scenario())
+
+
+def test_client_over_quota_is_rejected_with_429():
+    async def scenario():
+        scheduler = make_scheduler(per_client_limit=1)
+        blocker = Blocker()
+        running = asyncio.create_task(scheduler.run(blocker, "one", client_id="a"))
+        await wait_until(lambda: blocker.started == ["one"])
+
+        with pytest.raises(RequestRejected) as excinfo:
+            await scheduler.run(blocker, "two", client_id="a")
+        assert excinfo.value.status_code == 429
+
+        blocker.release("one")
+        assert await running == "one"
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_sheds_newest_batch_request_for_interactive():
+    async def scenario():
+        scheduler = make_scheduler(max_queue_size=2)
+        blocker = Blocker()
+        running = asyncio.create_task(scheduler.run(blocker, "run", client_id="a"))
+        await wait_until(lambda: blocker.started == ["run"])
+
+        older = asyncio.create_task(
+            scheduler.run(blocker, "older", client_id="b", priority=BATCH)
+        )
+        newer = asyncio.create_task(
+            scheduler.run(blocker, "newer", client_id="c", priority=BATCH)
+        )
+        await asyncio.sleep(0.01)
+        interactive = asyncio.create_task(
+            scheduler.run(blocker, "interactive", client_id="d")
+        )
+
+        with pytest.raises(RequestRejected) as excinfo:
+            await newer
+        assert excinfo.value.status_code == 503
+
+        for name in ("run", "interactive", "older"):
+            blocker.release(name)
+        assert await asyncio.gather(running, interactive, older) == [
+            "run",
+            "interactive",
+            "older",
+        ]
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_without_lower_priority_work_rejects_with_503():
+    async def scenario():
+        scheduler = make_scheduler(max_queue_size=1)
+        blocker = Blocker()
+        running = asyncio.create_task(scheduler.run(blocker, "run", client_id="a"))
+        await wait_until(lambda: blocker.started == ["run"])
+        queued = asyncio.create_task(scheduler.run(blocker, "queued", client_id="b"))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(RequestRejected) as excinfo:
+            await scheduler.run(blocker, "rejected", client_id="c")
+        assert excinfo.value.status_code == 503
+
+        blocker.release("run")
+        blocker.release("queued")
+        await asyncio.gather(running, queued)
+
+    asyncio.run(scenario())
+
+
+def test_queued_request_past_its_deadline_is_dropped():
+    async def scenario():
+        scheduler = make_scheduler()
+        blocker = Blocker()
+        running = asyncio.create_task(scheduler.run(blocker, "run", client_id="a"))
+        await wait_until(lambda: blocker.started == ["run"])
+
+        with pytest.raises(RequestRejected) as excinfo:
+            await scheduler.run(blocker, "late", client_id="b", timeout=0.05)
+        assert excinfo.value.status_code == 503
+
+        blocker.release("run")
+        await running
+        assert "late" not in blocker.started
+        assert scheduler.stats() == {"running": 0, "queued": 0, "clients": 0}
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_running_request_holds_slot_until_thread_finishes():
+    async def scenario():
+        scheduler = make_scheduler()
+        blocker = Blocker()
+        running = asyncio.create_task(scheduler.run(blocker, "run", client_id="a"))
+        await wait_until(lambda: blocker.started == ["run"])
+        queued = asyncio.create_task(scheduler.run(blocker, "next", client_id="b"))
+        await asyncio.sleep(0.01)
+
+        running.cancel()
+        await asyncio.sleep(0.05)
+        # The model call is still busy, so the slot must not be handed over yet
+        assert blocker.started == ["run"]
+        assert scheduler.stats()["running"] == 1
+
+        blocker.release("run")
+        blocker.release("next")
+        assert await queued == "next"
+        assert blocker.finished == ["run", "next"]
+        assert scheduler.stats() == {"running": 0, "queued": 0, "clients": 0}
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_queued_request_frees_its_place():
+    async def scenario():
+        scheduler = make_scheduler()
+        blocker = Blocker()
+        running = asyncio.create_task(scheduler.run(blocker, "run", client_id="a"))
+        await wait_until(lambda: blocker.started == ["run"])
+        queued = asyncio.create_task(scheduler.run(blocker, "queued", client_id="b"))
+        await asyncio.sleep(0.01)
+
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+
+        blocker.release("run")
+        await running
+        assert blocker.started == ["run"]
+        assert scheduler.stats() == {"running": 0, "queued": 0, "clients": 0}
+
+    asyncio.run(scenario())